@@ -10,19 +10,106 @@ ROOT = Path(__file__).resolve().parent.parent
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
+import asyncio
+import hmac
+import logging
 import os
 import secrets
-
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
+
+import orjson
+from dotenv import load_dotenv
 from fastapi import FastAPI, HTTPException, Header, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel
 
-from main import FantasyBot, DEFAULT_CONTEXT_PATH
+if TYPE_CHECKING:
+    from main import FantasyBot
+
+# The bot module (and espn-api) is imported on first use in _cached_bot() so
+# uvicorn binds and /health answers without paying that import. Load .env here
+# since API_PASSWORD / CORS_ORIGINS are read before main.py would load it.
+load_dotenv(ROOT / ".env")
+
+CONTEXT_PATH = ROOT / "context.json"
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response serialized with orjson instead of stdlib json.
+
+    Defined locally because fastapi.responses.ORJSONResponse is deprecated
+    in recent FastAPI releases. OPT_NON_STR_KEYS keeps int-keyed dicts
+    serializable, as they were with stdlib json.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
 
-app = FastAPI(title="Fantasy Bot API", version="0.1.0")
 
 _API_PASSWORD = os.getenv("API_PASSWORD")
-_valid_tokens: set[str] = set()
+
+# Session tokens: token -> monotonic expiry. Every token gets the same TTL, so
+# insertion order is expiry order and the oldest entries sit at the front.
+_TOKEN_TTL_SECONDS = 12 * 60 * 60
+_MAX_TOKENS = 256
+_TOKEN_SWEEP_SECONDS = 10 * 60
+_valid_tokens: OrderedDict[str, float] = OrderedDict()
+_tokens_lock = threading.Lock()
+
+
+def _drop_expired_tokens() -> None:
+    now = time.monotonic()
+    with _tokens_lock:
+        while _valid_tokens and next(iter(_valid_tokens.values())) < now:
+            _valid_tokens.popitem(last=False)
+
+
+async def _sweep_expired_tokens() -> None:
+    while True:
+        await asyncio.sleep(_TOKEN_SWEEP_SECONDS)
+        _drop_expired_tokens()
+
+
+def _configure_write_logging() -> None:
+    """Send ESPN write-module logs (e.g. espn_lineup) to stderr under uvicorn.
+
+    uvicorn leaves the root logger unconfigured, so without this the lineup
+    write trace would be dropped. LOG_LEVEL=DEBUG adds request/response bodies.
+    """
+    from main import log_level_from_env
+
+    write_logger = logging.getLogger("espn_lineup")
+    if write_logger.handlers:
+        return
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    write_logger.addHandler(handler)
+    write_logger.setLevel(log_level_from_env())
+    write_logger.propagate = False  # don't print twice if root is configured later
+
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI):
+    _configure_write_logging()
+    sweeper = asyncio.create_task(_sweep_expired_tokens())
+    try:
+        yield
+    finally:
+        sweeper.cancel()
+
+
+app = FastAPI(
+    title="Fantasy Bot API",
+    version="0.1.0",
+    default_response_class=ORJSONResponse,
+    lifespan=_lifespan,
+)
 
 
 def _require_auth(authorization: str | None = Header(default=None)) -> None:
@@ -32,26 +119,96 @@ def _require_auth(authorization: str | None = Header(default=None)) -> None:
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Authentication required")
     token = authorization[len("Bearer "):].strip()
-    if token not in _valid_tokens:
+    expires_at = _valid_tokens.get(token)
+    if expires_at is None or expires_at < time.monotonic():
         raise HTTPException(status_code=401, detail="Invalid or expired token")
 
-_cors_origins = os.getenv(
-    "CORS_ORIGINS",
-    "http://localhost:5173,http://127.0.0.1:5173"
-).split(",")
+_CORS_ORIGINS = tuple(
+    o.strip()
+    for o in os.getenv(
+        "CORS_ORIGINS",
+        "http://localhost:5173,http://127.0.0.1:5173"
+    ).split(",")
+    if o.strip()
+)
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=[o.strip() for o in _cors_origins],
+    allow_origins=_CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
 
-def get_bot() -> FantasyBot:
-    """Create bot instance using env / context from project root."""
-    return FantasyBot(context_path=ROOT / "context.json")
+# Cached bots are rebuilt after this many seconds so roster/injury data stays fresh.
+_BOT_TTL_SECONDS = 300
+# Serializes building the shared bot and resolving its lazy league/team, so
+# concurrent requests never fetch the league twice or see a half-built bot.
+_bot_lock = threading.Lock()
+
+
+def _new_bot() -> FantasyBot:
+    """Build an uncached bot from current ESPN data.
+
+    Endpoints that write to ESPN use this directly: a cached bot could carry
+    yesterday's scoringPeriodId / roster across ESPN's daily rollover.
+    """
+    from main import FantasyBot
+
+    return FantasyBot(context_path=CONTEXT_PATH)
+
+
+@lru_cache(maxsize=1)
+def _cached_bot(context_mtime_ns: int, ttl_bucket: int) -> FantasyBot:
+    """Build the bot; arguments only serve as the cache key."""
+    return _new_bot()
+
+
+def _context_mtime_ns() -> int:
+    try:
+        return CONTEXT_PATH.stat().st_mtime_ns
+    except FileNotFoundError:
+        return 0
+
+
+def get_bot(fresh: bool = False) -> FantasyBot:
+    """Return a shared bot instance using env / context from project root.
+
+    For read-only endpoints only — ESPN writes go through _new_bot(). The
+    instance is rebuilt when context.json changes on disk, when the TTL
+    lapses, after a mutating endpoint drops it, or when fresh=True.
+    """
+    with _bot_lock:
+        if fresh:
+            _cached_bot.cache_clear()
+        bot = _cached_bot(_context_mtime_ns(), int(time.monotonic() // _BOT_TTL_SECONDS))
+        # Resolve league/team once here, not in whichever request threads
+        # happen to touch them first.
+        bot.prime()
+    return bot
+
+
+def _drop_cached_bot() -> None:
+    """Forget the shared bot after an ESPN write (under the lock get_bot builds in)."""
+    with _bot_lock:
+        _cached_bot.cache_clear()
+
+
+@lru_cache(maxsize=1)
+def _load_context(mtime_ns: int) -> dict[str, Any]:
+    """Parse context.json; the mtime argument only serves as the cache key."""
+    if not mtime_ns:
+        return {}
+    return orjson.loads(CONTEXT_PATH.read_bytes())
+
+
+def get_context() -> dict[str, Any]:
+    """Return parsed context.json, re-read only when the file changes.
+
+    Shared across requests — callers must treat the result as read-only.
+    """
+    return _load_context(_context_mtime_ns())
 
 
 class AuthBody(BaseModel):
@@ -79,15 +236,18 @@ def auth(body: AuthBody):
     """
     if not _API_PASSWORD:
         return {"token": None, "authenticated": True}
-    if body.password != _API_PASSWORD:
+    if not hmac.compare_digest(body.password.encode(), _API_PASSWORD.encode()):
         raise HTTPException(status_code=401, detail="Incorrect password")
     token = secrets.token_hex(32)
-    _valid_tokens.add(token)
+    with _tokens_lock:
+        _valid_tokens[token] = time.monotonic() + _TOKEN_TTL_SECONDS
+        if len(_valid_tokens) > _MAX_TOKENS:
+            _valid_tokens.popitem(last=False)  # evict the oldest session
     return {"token": token, "authenticated": True}
 
 
 @app.get("/analyze")
-def analyze():
+async def analyze():
     """Return structured suggestions (IR, lineup, streaming) plus team metadata.
 
     Response shape:
@@ -99,11 +259,13 @@ def analyze():
     }
     """
     try:
-        bot = get_bot()
-        suggestions = bot.get_suggestions()
+        # ESPN fetches block for seconds; keep them off the event loop.
+        bot = await asyncio.to_thread(get_bot)
+        suggestions = await asyncio.to_thread(bot.get_suggestions)
         team_name = getattr(bot.team, "team_name", "") or ""
         record = bot.context.get("season", {}).get("current_record", "")
-        return {**suggestions, "team": {"name": team_name, "record": record}}
+        # Return the response directly so FastAPI skips jsonable_encoder.
+        return ORJSONResponse(content={**suggestions, "team": {"name": team_name, "record": record}})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -112,20 +274,29 @@ def analyze():
 def execute(body: ExecuteBody, _auth: None = Depends(_require_auth)):
     """Execute changes (confirm=True) or return new suggestions (generate_new=True)."""
     try:
-        bot = get_bot()
         if body.confirm:
+            bot = _new_bot()  # writes must use the current scoring period and roster
             actions = bot.run_daily_cycle(dry_run=False, api_confirm=True)
+            _drop_cached_bot()  # roster changed on ESPN
+            _lineup_status_cache["v"] = None
+            _load_context.cache_clear()  # run_daily_cycle rewrote context.json
             return {"executed": True, "actions": actions}
         if body.generate_new:
-            suggestions = bot.get_suggestions()
+            # "new suggestions" should see fresh ESPN data
+            suggestions = get_bot(fresh=True).get_suggestions()
             return {"executed": False, "suggestions": suggestions}
         return {"executed": False, "actions": []}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# The UI polls /lineup-status on game days; serve repeat polls from memory.
+_LINEUP_STATUS_TTL_SECONDS = 30
+_lineup_status_cache: dict[str, Any] = {"t": 0.0, "v": None}
+
+
 @app.get("/lineup-status")
-def lineup_status():
+async def lineup_status():
     """Return game-day lineup status: urgent swaps and questionable starters.
 
     Response shape:
@@ -147,11 +318,21 @@ def lineup_status():
         ]
     }
     """
+    if (
+        _lineup_status_cache["v"] is not None
+        and time.monotonic() - _lineup_status_cache["t"] < _LINEUP_STATUS_TTL_SECONDS
+    ):
+        return _lineup_status_cache["v"]
     try:
-        bot = get_bot()
-        return bot.check_lineup_status()
+        # Rebuild on fresh ESPN data so the 30 s TTL above is the real staleness
+        # bound (the shared bot can be _BOT_TTL_SECONDS old). The fresh bot then
+        # also serves /analyze. Construction and the check both block on ESPN I/O.
+        bot = await asyncio.to_thread(get_bot, fresh=True)
+        status = await asyncio.to_thread(bot.check_lineup_status)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    _lineup_status_cache.update(t=time.monotonic(), v=status)
+    return status
 
 
 @app.post("/execute-lineup")
@@ -161,12 +342,14 @@ def execute_lineup(body: ExecuteLineupBody, _auth: None = Depends(_require_auth)
     Response: {"success": bool, "message": string}
     """
     try:
-        bot = get_bot()
+        bot = _new_bot()  # writes must use the current scoring period and roster
         message = bot.execute_lineup_swap(
             starter_player_id=body.starter_player_id,
             replacement_player_id=body.replacement_player_id,
             starter_slot=body.starter_slot,
         )
+        _drop_cached_bot()  # roster changed on ESPN
+        _lineup_status_cache["v"] = None
         return {"success": "failed" not in message.lower(), "message": message}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -176,19 +359,24 @@ def execute_lineup(body: ExecuteLineupBody, _auth: None = Depends(_require_auth)
 def last_run():
     """Return the most recent bot run summary from context.json tracking section."""
     try:
-        bot = get_bot()
-        tracking = bot.context.get("tracking", {})
+        context = get_context()
+        tracking = context.get("tracking", {})
         return {
             "last_run_utc": tracking.get("last_run_utc"),
             "moves_made_today": tracking.get("moves_made_today", []),
             "weekly_transactions_used": tracking.get("weekly_transactions_used", 0),
             "plan_for_tomorrow": tracking.get("plan_for_tomorrow", ""),
-            "current_record": bot.context.get("season", {}).get("current_record", ""),
+            "current_record": context.get("season", {}).get("current_record", ""),
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+_HEALTH_BODY = b'{"status":"ok"}'
+
+
 @app.get("/health")
 def health():
-    return {"status": "ok"}
+    # Prebuilt bytes skip serialization entirely. A fresh Response per call is
+    # still required: middleware (CORS) appends to the response's header list.
+    return Response(content=_HEALTH_BODY, media_type="application/json")
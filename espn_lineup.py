@@ -12,6 +12,8 @@ Setup:
      the default body, with placeholders {league_id}, {team_id}, {year},
      {scoring_period_id}, {starter_player_id}, {replacement_player_id},
      {starter_slot_id}, {bench_slot_id}.
+  4. Environment overrides are read once at import time; restart the process
+     after changing them.
 
 Standard NBA ESPN slot IDs (defaults — confirm from your browser capture,
 see CAPTURE_LINEUP.md):
@@ -30,20 +32,24 @@ see CAPTURE_LINEUP.md):
 from __future__ import annotations
 
 import json
+import logging
 import os
-from pathlib import Path
+import re
 
+import orjson
 
-# Same confirmed write host as add/drop transactions.
+from espn_write import get_session, load_body_template
+
+logger = logging.getLogger(__name__)
+
+
+# Same confirmed write host as add/drop transactions; the pooled session (with
+# ESPN's write headers) comes from espn_write so both share connections.
 _DEFAULT_BASE = "https://lm-api-writes.fantasy.espn.com"
 _FBA_PATH = "/apis/v3/games/fba/seasons/{year}/segments/0/leagues/{league_id}/transactions/"
 
-# Same headers required for all ESPN write API calls (confirmed from browser capture).
-_HEADERS = {
-    "Content-Type": "application/json",
-    "x-fantasy-platform": "espn-fantasy-web",
-    "x-fantasy-source": "kona",
-}
+# Words in an ESPN response message that mark the write as rejected.
+_ERROR_RE = re.compile(r"error|invalid", re.IGNORECASE)
 
 # Standard ESPN NBA fantasy slot IDs. May vary by league configuration.
 # Capture a real lineup-change request (see CAPTURE_LINEUP.md) to confirm.
@@ -64,16 +70,34 @@ SLOT_IDS: dict[str, int] = {
 }
 
 
+# Upper- and lower-case aliases so the common lookups skip str()/upper().
+_SLOT_GET = {
+    **{name.lower(): slot_id for name, slot_id in SLOT_IDS.items()},
+    **SLOT_IDS,
+}.get
+
+
 def get_slot_id(slot_name: str) -> int:
     """Convert a slot position string to its ESPN numeric slot ID.
 
     Defaults to 9 (bench) if the slot name is not in the standard mapping.
     """
-    return SLOT_IDS.get(str(slot_name).upper(), 9)
+    slot_id = _SLOT_GET(slot_name)
+    if slot_id is None:
+        slot_id = _SLOT_GET(str(slot_name).upper(), 9)
+    return slot_id
+
 
+# Custom bodies may hold unquoted placeholders (e.g. "teamId": {team_id}), so the
+# template is not valid JSON until filled in; substitute all names in one pass.
+_PLACEHOLDER_RE = re.compile(
+    r"\{(league_id|team_id|year|scoring_period_id|starter_player_id|"
+    r"replacement_player_id|starter_slot_id|bench_slot_id|member_id)\}"
+)
 
-def _get_cookies(swid: str, espn_s2: str) -> dict[str, str]:
-    return {"SWID": swid, "espn_s2": espn_s2}
+_LINEUP_URL_OVERRIDE = os.getenv("ESPN_LINEUP_URL", "").strip() or None
+_LINEUP_BASE = (os.getenv("ESPN_LINEUP_BASE", "").strip() or _DEFAULT_BASE).rstrip("/")
+_BODY_TEMPLATE = load_body_template("ESPN_LINEUP_BODY_FILE", "ESPN_LINEUP_BODY")
 
 
 def _get_lineup_url(league_id: int, year: int) -> str:
@@ -81,12 +105,9 @@ def _get_lineup_url(league_id: int, year: int) -> str:
 
     Override with ESPN_LINEUP_URL env var if the default does not work.
     """
-    url = os.getenv("ESPN_LINEUP_URL", "").strip()
-    if url:
-        return url
-    base = os.getenv("ESPN_LINEUP_BASE", _DEFAULT_BASE).strip() or _DEFAULT_BASE
-    path = _FBA_PATH.format(league_id=league_id, year=year)
-    return base.rstrip("/") + path
+    if _LINEUP_URL_OVERRIDE:
+        return _LINEUP_URL_OVERRIDE
+    return _LINEUP_BASE + _FBA_PATH.format(league_id=league_id, year=year)
 
 
 def _get_lineup_body(
@@ -116,27 +137,20 @@ def _get_lineup_body(
       {starter_player_id}, {replacement_player_id},
       {starter_slot_id}, {bench_slot_id}, {member_id}
     """
-    body_file = os.getenv("ESPN_LINEUP_BODY_FILE", "").strip()
-    if body_file and Path(body_file).exists():
-        raw = Path(body_file).read_text(encoding="utf-8")
-    else:
-        raw = os.getenv("ESPN_LINEUP_BODY", "").strip()
-
+    raw = _BODY_TEMPLATE
     if raw:
         replacements = {
-            "{league_id}": str(league_id),
-            "{team_id}": str(team_id),
-            "{year}": str(year),
-            "{scoring_period_id}": str(scoring_period_id),
-            "{starter_player_id}": str(starter_player_id),
-            "{replacement_player_id}": str(replacement_player_id),
-            "{starter_slot_id}": str(starter_slot_id),
-            "{bench_slot_id}": str(bench_slot_id),
-            "{member_id}": swid,
+            "league_id": str(league_id),
+            "team_id": str(team_id),
+            "year": str(year),
+            "scoring_period_id": str(scoring_period_id),
+            "starter_player_id": str(starter_player_id),
+            "replacement_player_id": str(replacement_player_id),
+            "starter_slot_id": str(starter_slot_id),
+            "bench_slot_id": str(bench_slot_id),
+            "member_id": swid,
         }
-        for placeholder, value in replacements.items():
-            raw = raw.replace(placeholder, value)
-        return json.loads(raw)
+        return json.loads(_PLACEHOLDER_RE.sub(lambda m: replacements[m.group(1)], raw))
 
     # Confirmed body format from browser capture (HTTP 200, status=EXECUTED).
     # Outer type is "ROSTER"; item slot fields are fromLineupSlotId/toLineupSlotId.
@@ -197,8 +211,6 @@ def lineup_swap(
         from your browser and set ESPN_LINEUP_BODY or ESPN_LINEUP_BODY_FILE.
         See CAPTURE_LINEUP.md for step-by-step instructions.
     """
-    import requests
-
     url = _get_lineup_url(league_id, year)
     body = _get_lineup_body(
         league_id=league_id,
@@ -211,20 +223,19 @@ def lineup_swap(
         bench_slot_id=bench_slot_id,
         swid=swid,
     )
-    cookies = _get_cookies(swid, espn_s2)
 
-    print(f"[lineup_swap] POST {url}")
-    print(f"[lineup_swap] body: {json.dumps(body, indent=2)}")
-    resp = requests.post(url, json=body, cookies=cookies, headers=_HEADERS, timeout=30)
-    print(f"[lineup_swap] ESPN response: HTTP {resp.status_code}")
-    print(f"[lineup_swap] ESPN body: {resp.text}")
+    logger.info("[lineup_swap] POST %s", url)
+    logger.debug("[lineup_swap] body: %s", body)
+    resp = get_session(swid, espn_s2).post(url, json=body, timeout=30)
+    logger.info("[lineup_swap] ESPN response: HTTP %s", resp.status_code)
+    logger.debug("[lineup_swap] ESPN body: %s", resp.text)
 
     if resp.status_code >= 400:
         raise RuntimeError(
             f"ESPN lineup swap failed: HTTP {resp.status_code} — {resp.text[:500]}"
         )
 
-    data = resp.json() if resp.text else {}
+    data = orjson.loads(resp.content) if resp.content else {}
     if isinstance(data, dict):
         if data.get("error"):
             raise RuntimeError(f"ESPN lineup error: {data.get('error')}")
@@ -232,7 +243,7 @@ def lineup_swap(
             msgs = data.get(key)
             if isinstance(msgs, list) and msgs and isinstance(msgs[0], dict):
                 msg = msgs[0].get("message") or msgs[0].get("text") or str(msgs[0])
-                if "error" in msg.lower() or "invalid" in msg.lower():
+                if _ERROR_RE.search(msg):
                     raise RuntimeError(f"ESPN lineup error: {msg}")
-            elif isinstance(msgs, str) and ("error" in msgs.lower() or "invalid" in msgs.lower()):
+            elif isinstance(msgs, str) and _ERROR_RE.search(msgs):
                 raise RuntimeError(f"ESPN lineup error: {msgs}")
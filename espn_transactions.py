@@ -10,38 +10,45 @@ Setup:
   2. Optionally set ESPN_TRANSACTION_BODY or ESPN_TRANSACTION_BODY_FILE to override
      the default body, with placeholders {league_id}, {team_id}, {year},
      {drop_player_id}, {add_player_id}, {scoring_period_id}.
+
+Environment overrides are read once at import time; restart the process after
+changing them.
 """
 
 from __future__ import annotations
 
 import json
 import os
-from pathlib import Path
+import re
+
+import orjson
+
+from espn_write import get_session, load_body_template
 
 
 # Confirmed write endpoint from browser capture.
 _DEFAULT_BASE = "https://lm-api-writes.fantasy.espn.com"
 _FBA_PATH = "/apis/v3/games/fba/seasons/{year}/segments/0/leagues/{league_id}/transactions/"
 
-# Headers required by ESPN's transaction API (confirmed from browser capture).
-_HEADERS = {
-    "Content-Type": "application/json",
-    "x-fantasy-platform": "espn-fantasy-web",
-    "x-fantasy-source": "kona",
-}
+# Words in an ESPN response message that mark the write as rejected.
+_ERROR_RE = re.compile(r"error|invalid", re.IGNORECASE)
 
 
-def _get_cookies(swid: str, espn_s2: str) -> dict[str, str]:
-    return {"SWID": swid, "espn_s2": espn_s2}
+# Custom bodies may hold unquoted placeholders (e.g. "teamId": {team_id}), so the
+# template is not valid JSON until filled in; substitute all names in one pass.
+_PLACEHOLDER_RE = re.compile(
+    r"\{(league_id|team_id|year|drop_player_id|add_player_id|scoring_period_id)\}"
+)
+
+_TXN_URL_OVERRIDE = os.getenv("ESPN_TRANSACTION_URL", "").strip() or None
+_TXN_BASE = (os.getenv("ESPN_TRANSACTION_BASE", "").strip() or _DEFAULT_BASE).rstrip("/")
+_BODY_TEMPLATE = load_body_template("ESPN_TRANSACTION_BODY_FILE", "ESPN_TRANSACTION_BODY")
 
 
 def _get_transaction_url(league_id: int, year: int) -> str:
-    url = os.getenv("ESPN_TRANSACTION_URL", "").strip()
-    if url:
-        return url
-    base = os.getenv("ESPN_TRANSACTION_BASE", _DEFAULT_BASE).strip() or _DEFAULT_BASE
-    path = _FBA_PATH.format(league_id=league_id, year=year)
-    return base.rstrip("/") + path
+    if _TXN_URL_OVERRIDE:
+        return _TXN_URL_OVERRIDE
+    return _TXN_BASE + _FBA_PATH.format(league_id=league_id, year=year)
 
 
 def _get_transaction_body(
@@ -56,24 +63,17 @@ def _get_transaction_body(
     Build POST JSON body from env (file or string) with placeholders,
     or return the correct ESPN FREEAGENT add/drop body format.
     """
-    body_file = os.getenv("ESPN_TRANSACTION_BODY_FILE", "").strip()
-    if body_file and Path(body_file).exists():
-        raw = Path(body_file).read_text(encoding="utf-8")
-    else:
-        raw = os.getenv("ESPN_TRANSACTION_BODY", "").strip()
-
+    raw = _BODY_TEMPLATE
     if raw:
         replacements = {
-            "{league_id}": str(league_id),
-            "{team_id}": str(team_id),
-            "{year}": str(year),
-            "{drop_player_id}": str(drop_player_id),
-            "{add_player_id}": str(add_player_id),
-            "{scoring_period_id}": str(scoring_period_id),
+            "league_id": str(league_id),
+            "team_id": str(team_id),
+            "year": str(year),
+            "drop_player_id": str(drop_player_id),
+            "add_player_id": str(add_player_id),
+            "scoring_period_id": str(scoring_period_id),
         }
-        for placeholder, value in replacements.items():
-            raw = raw.replace(placeholder, value)
-        return json.loads(raw)
+        return json.loads(_PLACEHOLDER_RE.sub(lambda m: replacements[m.group(1)], raw))
 
     # Confirmed body format from browser capture (Feb 2026).
     # type "FREEAGENT" = add from free agents; items list ADD then DROP.
@@ -106,8 +106,6 @@ def add_drop(
     scoring_period_id should be the current ESPN scoring period (fetched from
     league.scoringPeriodId). Raises on HTTP error or ESPN error in response.
     """
-    import requests
-
     url = _get_transaction_url(league_id, year)
     body = _get_transaction_body(
         league_id=league_id,
@@ -117,16 +115,15 @@ def add_drop(
         add_player_id=add_player_id,
         scoring_period_id=scoring_period_id,
     )
-    cookies = _get_cookies(swid, espn_s2)
 
-    resp = requests.post(url, json=body, cookies=cookies, headers=_HEADERS, timeout=30)
+    resp = get_session(swid, espn_s2).post(url, json=body, timeout=30)
 
     if resp.status_code >= 400:
         raise RuntimeError(
             f"ESPN transaction failed: HTTP {resp.status_code} — {resp.text[:500]}"
         )
 
-    data = resp.json() if resp.text else {}
+    data = orjson.loads(resp.content) if resp.content else {}
     if isinstance(data, dict):
         if data.get("error"):
             raise RuntimeError(f"ESPN transaction error: {data.get('error')}")
@@ -134,7 +131,7 @@ def add_drop(
             msgs = data.get(key)
             if isinstance(msgs, list) and msgs and isinstance(msgs[0], dict):
                 msg = msgs[0].get("message") or msgs[0].get("text") or str(msgs[0])
-                if "error" in msg.lower() or "invalid" in msg.lower():
+                if _ERROR_RE.search(msg):
                     raise RuntimeError(f"ESPN transaction error: {msg}")
-            elif isinstance(msgs, str) and ("error" in msgs.lower() or "invalid" in msgs.lower()):
+            elif isinstance(msgs, str) and _ERROR_RE.search(msgs):
                 raise RuntimeError(f"ESPN transaction error: {msgs}")
@@ -0,0 +1,61 @@
+"""
+Shared plumbing for the ESPN write modules (espn_transactions, espn_lineup).
+
+Both POST to ESPN's lm-api-writes host with the same headers and auth cookies,
+so they share one pooled session per credential pair and one way of reading a
+captured body template from the environment.
+"""
+
+from __future__ import annotations
+
+import os
+from functools import lru_cache
+from pathlib import Path
+
+
+# Headers required by ESPN's transaction API (confirmed from browser capture).
+_HEADERS = {
+    "Content-Type": "application/json",
+    "x-fantasy-platform": "espn-fantasy-web",
+    "x-fantasy-source": "kona",
+}
+
+
+# requests is imported on first use so processes that never write to ESPN
+# (e.g. the API server answering read-only endpoints) skip its import cost.
+_requests = None
+
+
+def _get_requests():
+    global _requests
+    if _requests is None:
+        import requests as _requests
+    return _requests
+
+
+@lru_cache(maxsize=4)
+def get_session(swid: str, espn_s2: str):
+    """Return a pooled session with ESPN headers and auth cookies preset.
+
+    One session per credential pair, so consecutive writes (add/drop and
+    lineup) reuse the TCP/TLS connection to ESPN and build no per-call
+    header/cookie dicts. Being a requests.Session, it also keeps any
+    Set-Cookie ESPN sends back and replays it on later writes in this process.
+    """
+    requests = _get_requests()
+    session = requests.Session()
+    session.headers.update(_HEADERS)
+    session.cookies.update({"SWID": swid, "espn_s2": espn_s2})
+    session.mount(
+        "https://",
+        requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=0),
+    )
+    return session
+
+
+def load_body_template(file_env: str, body_env: str) -> str | None:
+    """Return the raw custom body template from env (file or string), if any."""
+    body_file = os.getenv(file_env, "").strip()
+    if body_file and Path(body_file).exists():
+        return Path(body_file).read_text(encoding="utf-8")
+    return os.getenv(body_env, "").strip() or None
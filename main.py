@@ -3,21 +3,104 @@
 from __future__ import annotations
 
 import argparse
-import json
+import heapq
+import logging
+import mmap
+import operator
 import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
+from functools import cached_property, reduce
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any, Callable, Iterable
 
+import orjson
 from dotenv import load_dotenv
-from espn_api.basketball import League
+
+if TYPE_CHECKING:
+    from espn_api.basketball import League
 
 # Load environment variables from .env file
 load_dotenv()
 
+# ESPN write modules read their URL/body overrides from the environment at
+# import time, so they are imported after load_dotenv(). Both are cheap
+# (requests is imported lazily inside them).
+from espn_lineup import get_slot_id, lineup_swap
+from espn_transactions import add_drop
+
 DEFAULT_CONTEXT_PATH = Path("context.json")
 
+# Fallbacks for optional context.json keys, filled in once on load so call
+# sites can index sections directly instead of chaining .get(..., default).
+_CONTEXT_DEFAULTS: dict[str, Any] = {
+    "season": {"current_record": ""},
+    "league": {"season_year": 2026, "max_ir_slots": 1},
+    "strategy": {
+        "protection_guardrails": {
+            "untouchables": [],
+            "drop_block_orank_better_than": 50,
+            "allow_drop_if_season_ending_injury": True,
+        },
+        "tiered_streaming": {"min_points_gain": 3.0, "dry_run": True},
+    },
+    "tracking": {
+        "weekly_transactions_used": 0,
+        "last_run_utc": "",
+        "moves_made_today": [],
+        "plan_for_tomorrow": "",
+    },
+}
+
+# Roster slot / injury status groups (ESPN names plus the BN/IL aliases).
+_BENCH_SLOTS = frozenset({"BE", "BN"})
+_IR_SLOTS = frozenset({"IR", "IL"})
+_STARTING_SLOTS = frozenset({"PG", "SG", "SF", "PF", "C", "G", "F", "UT", "UTIL"})
+_HEALTHY = frozenset({"ACTIVE", "HEALTHY", ""})
+# ESPN API returns DAY_TO_DAY (not DTD) and DOUBTFUL for at-risk players
+_AT_RISK = frozenset({"OUT", "DOUBTFUL", "DTD", "DAY_TO_DAY"})
+_QUESTIONABLE = frozenset({"QUESTIONABLE"})
+_UNAVAILABLE = _AT_RISK | _QUESTIONABLE | _IR_SLOTS
+
+# Sort key for players already scored by FantasyBot.points_value (memoized as _pv).
+_BY_POINTS = operator.attrgetter("_pv")
+
+# Injury status/note markers for a season-ending injury (one C-level scan).
+_SEASON_END_RE = re.compile(r"OUT FOR SEASON|SEASON[- ]ENDING|\bIR\b", re.IGNORECASE)
+
+
+def _apply_context_defaults(data: dict[str, Any], defaults: dict[str, Any], path: str = "") -> dict[str, Any]:
+    """Fill keys missing from data with defaults (in place), recursing into sections.
+
+    Raises ValueError when a section that must be an object holds something else,
+    so a malformed context.json fails at load rather than deep inside a run.
+    """
+    for key, default in defaults.items():
+        if isinstance(default, dict):
+            section = data.get(key)
+            if section is None:
+                section = data[key] = {}
+            elif not isinstance(section, dict):
+                raise ValueError(f"context.json: '{path}{key}' must be an object")
+            _apply_context_defaults(section, default, f"{path}{key}.")
+        elif key not in data:
+            data[key] = list(default) if isinstance(default, list) else default
+    return data
+
+
+def _load_context_file(path: Path) -> dict[str, Any]:
+    """Read a context.json file with _CONTEXT_DEFAULTS filled in (defaults only if it doesn't exist).
+
+    File-only: no ESPN access, so callers can consult settings before building a bot.
+    """
+    data = orjson.loads(path.read_bytes()) if path.exists() else {}
+    if not isinstance(data, dict):
+        raise ValueError("context.json: top level must be an object")
+    return _apply_context_defaults(data, _CONTEXT_DEFAULTS)
+
 
 def _get_todays_nba_team_ids() -> set[str]:
     """Return lowercased team name variants for NBA teams playing today.
@@ -47,6 +130,18 @@ def _get_todays_nba_team_ids() -> set[str]:
         return set()
 
 
+def _attr_str(obj: Any, name: str) -> str:
+    """Return an attribute as a string, "" when missing or falsy.
+
+    espn_api string fields are already str, so the common case skips the str()
+    call and the `or ""` fallback of the old inline idiom.
+    """
+    value = getattr(obj, name, None)
+    if isinstance(value, str):
+        return value
+    return str(value) if value else ""
+
+
 def _has_game_today(player: Any, todays_teams: set[str], fallback: bool = True) -> bool:
     """Return True if the player's pro team plays today.
 
@@ -56,22 +151,79 @@ def _has_game_today(player: Any, todays_teams: set[str], fallback: bool = True)
     """
     if not todays_teams:
         return fallback
-    pro_team = str(getattr(player, "proTeam", "") or "").lower().strip()
+    pro_team = _attr_str(player, "proTeam").lower().strip()
     if not pro_team or pro_team in {"none", "fa", "free agent"}:
         return True  # unknown team — don't penalise
     return any(t == pro_team or t in pro_team or pro_team in t for t in todays_teams)
 
 
+def _slot_of(player: Any) -> str:
+    """Return the player's upper-cased lineup slot, memoized on the player as _slot_u."""
+    slot = player.__dict__.get("_slot_u")
+    if slot is None:
+        slot = player._slot_u = _attr_str(player, "lineupSlot").upper()
+    return slot
+
+
+def _status_of(player: Any) -> str:
+    """Return the player's upper-cased injury status, memoized on the player as _status_u."""
+    status = player.__dict__.get("_status_u")
+    if status is None:
+        status = player._status_u = _attr_str(player, "injuryStatus").upper()
+    return status
+
+
+def _can_fill_slot(player: Any, slot: str) -> bool:
+    """Return True if ESPN lists slot among the player's eligible lineup slots.
+
+    Players without eligibility data are treated as eligible so missing data
+    never hides a suggestion.
+    """
+    eligible = getattr(player, "eligibleSlots", None)
+    return not eligible or slot in eligible
+
+
+def _float_attr(obj: Any, name: str) -> float:
+    """Return a numeric instance attribute as float, treating missing/None as 0.0.
+
+    Reads the instance __dict__ directly: espn_api sets player stats in
+    __init__, so the full getattr lookup isn't needed on this hot path.
+    """
+    value = obj.__dict__.get(name)
+    return float(value) if value else 0.0
+
+
+def _best(players: Iterable[Any], value: Callable[[Any], float]) -> tuple[Any | None, float]:
+    """Return (player, value) for the highest-valued player in one pass.
+
+    Each player is scored exactly once; ties keep the earliest player, as max()
+    does. Returns (None, -inf) for an empty input.
+    """
+    best_player, best_val = None, float("-inf")
+    for player in players:
+        val = value(player)
+        if val > best_val:
+            best_player, best_val = player, val
+    return best_player, best_val
+
+
 def _games_remaining_this_week(player: Any) -> int:
     """Return the number of games the player's pro team has from today through Sunday.
 
     Uses player.schedule: dict of {scoring_period_id: {'team': str, 'date': datetime}}.
     Returns 1 as a safe fallback when schedule data is unavailable.
+
+    Memoized on the player as _gr = (date, count): streaming scores the same
+    roster and free agents repeatedly in a cycle, and each call walks the whole
+    season schedule. Keyed on today's date so a long-lived bot never goes stale.
     """
     schedule = getattr(player, "schedule", None)
     if not schedule:
         return 1
     today = datetime.now().date()
+    cached = player.__dict__.get("_gr")
+    if cached is not None and cached[0] == today:
+        return cached[1]
     week_end = today + timedelta(days=(6 - today.weekday()))  # Sunday of current week
     count = 0
     for entry in schedule.values():
@@ -80,17 +232,73 @@ def _games_remaining_this_week(player: Any) -> int:
             game_date = game_date.date()
         if game_date is not None and today <= game_date <= week_end:
             count += 1
-    return max(count, 1)  # floor of 1 so we never zero out a player unfairly
+    count = max(count, 1)  # floor of 1 so we never zero out a player unfairly
+    player._gr = (today, count)
+    return count
+
+
+def _read_choice(prompt: str) -> str:
+    """Read a lower-cased answer: one keypress on a terminal, a full line otherwise.
+
+    Falls back to input() when stdin is not a TTY (CI, pipes), so scripted
+    answers like "decline" / "new" keep working.
+    """
+    if not sys.stdin.isatty():
+        return input(prompt).strip().lower()
+    print(prompt, end="", flush=True)
+    try:
+        import msvcrt
+    except ImportError:  # POSIX
+        import termios
+        import tty
+
+        fd = sys.stdin.fileno()
+        saved = termios.tcgetattr(fd)
+        try:
+            tty.setcbreak(fd)  # unbuffered, but Ctrl-C still raises KeyboardInterrupt
+            key = sys.stdin.read(1)
+        finally:
+            termios.tcsetattr(fd, termios.TCSADRAIN, saved)
+    else:
+        key = msvcrt.getwch()
+        if key == "\x03":
+            raise KeyboardInterrupt
+    print(key)
+    return key.strip().lower()
+
+
+def log_level_from_env() -> int:
+    """LOG_LEVEL as a logging level; unset or unknown names (e.g. "verbose") give INFO."""
+    name = os.getenv("LOG_LEVEL", "INFO").strip().upper()
+    return logging.getLevelNamesMapping().get(name, logging.INFO)
 
 
 DEFAULT_CONTEXT_MD_PATH = Path("CONTEXT.md")
 
+# Standing plan written to CONTEXT.md and tracking.plan_for_tomorrow each run.
+_GAME_PLAN = (
+    "Attack tomorrow with lineup re-optimization before tip-off, then stream one Tier-3 spot "
+    "only if best FA avg_points clears min_points_gain and weekly adds remain."
+)
+
+# CONTEXT.md path -> (st_mtime_ns, st_size, offset of the run block) as this
+# process last wrote it. Lets a long-lived process (the API) skip re-scanning
+# the file for the old block when nobody else has touched it since. Kept at
+# module level rather than on the bot because the API does not write through a
+# long-lived instance: confirmed writes run on a fresh uncached bot, and the
+# cached read-only bot is replaced on TTL expiry and after every write.
+_context_md_cut_cache: dict[Path, tuple[int, int, int]] = {}
+
 
 @dataclass
 class CandidateSwap:
     drop_player: Any
     add_player: Any
     gain: float
+    drop_games: int
+    add_games: int
+    drop_week_value: float
+    add_week_value: float
 
 
 class FantasyBot:
@@ -98,21 +306,48 @@ class FantasyBot:
         self.context_path = context_path
         self.context_md_path = context_md_path
         self.context = self._load_context()
-        self.league = self._init_league()
-        self.team = self._get_my_team()
+        # Guardrails / streaming thresholds are consulted per player or per
+        # streaming pass; normalize them once.
+        guardrails = self.context["strategy"]["protection_guardrails"]
+        self._untouchables = frozenset(p.lower() for p in guardrails["untouchables"])
+        self._rank_limit = int(guardrails["drop_block_orank_better_than"])
+        self._allow_season_ending = bool(guardrails["allow_drop_if_season_ending_injury"])
+        self._min_points_gain = float(self.context["strategy"]["tiered_streaming"]["min_points_gain"])
+        self._fa_cache: dict[int, list[Any]] = {}
+
+    @cached_property
+    def league(self) -> League:
+        """ESPN league, connected on first access (one batched fetch)."""
+        return self._init_league()
+
+    @cached_property
+    def team(self):
+        """The bot's team within league, resolved on first access."""
+        return self._get_my_team()
+
+    def prime(self) -> None:
+        """Resolve the lazy league and team now.
+
+        cached_property has no lock; call this before sharing the bot across
+        threads so only one of them fetches the league.
+        """
+        _ = self.team  # first access fetches the league, then finds our team
 
     def _load_context(self) -> dict[str, Any]:
-        """Load context.json, return empty dict if file doesn't exist."""
-        if not self.context_path.exists():
-            return {}
-        with self.context_path.open("r", encoding="utf-8") as fp:
-            return json.load(fp)
+        """Load context.json with _CONTEXT_DEFAULTS filled in (defaults only if the file doesn't exist)."""
+        return _load_context_file(self.context_path)
 
     def _save_context(self) -> None:
-        """Save context to context.json file."""
-        with self.context_path.open("w", encoding="utf-8") as fp:
-            json.dump(self.context, fp, indent=2)
-            fp.write("\n")
+        """Save context to context.json file.
+
+        Written to a temp file and swapped in with os.replace so a crash
+        mid-write can never leave a truncated context.json behind.
+        """
+        tmp_path = self.context_path.with_suffix(".json.tmp")
+        tmp_path.write_bytes(
+            orjson.dumps(self.context, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+        )
+        os.replace(tmp_path, self.context_path)
 
     def _get_setting(self, env_key: str, *context_keys: str) -> str | None:
         """Get setting from environment variable first, then context.json fallback.
@@ -130,16 +365,10 @@ class FantasyBot:
             return env_value.strip()
         
         # Fallback to context.json
-        if not self.context:
-            return None
-            
-        current = self.context
-        for key in context_keys:
-            if not isinstance(current, dict):
-                return None
-            current = current.get(key)
-            if current is None:
-                return None
+        try:
+            current = reduce(operator.getitem, context_keys, self.context)
+        except (KeyError, TypeError):
+            return None  # missing key, or a non-object along the path
         return str(current) if current is not None else None
 
     def _require_setting(self, setting_name: str, value: str | None) -> str:
@@ -154,22 +383,29 @@ class FantasyBot:
         return value
 
     def _init_league(self) -> League:
-        """Initialize ESPN League connection using env vars or context.json."""
+        """Initialize ESPN League connection using env vars or context.json.
+
+        League() loads everything in a fixed set of batched requests (league
+        views incl. mRoster, the pro-player list via get_pro_players, pro
+        schedules, draft). Player stats used here come from that roster payload,
+        so reading attributes never triggers per-player HTTP calls.
+        """
         league_id = self._get_setting("LEAGUE_ID", "league", "league_id")
         league_id = self._require_setting("LEAGUE_ID", league_id)
         
         season_year = self._get_setting("SEASON_YEAR", "league", "season_year")
         if season_year is None:
-            season_year = self.context.get("league", {}).get("season_year", 2026)
-        else:
-            season_year = int(season_year)
+            season_year = self.context["league"]["season_year"]
         
         espn_s2 = self._get_setting("ESPN_S2", "league", "espn_auth", "espn_s2")
         espn_s2 = self._require_setting("ESPN_S2", espn_s2)
         
         swid = self._get_setting("SWID", "league", "espn_auth", "swid")
         swid = self._require_setting("SWID", swid)
-        
+
+        # Imported here so `import main` (API startup, helper use) skips espn_api.
+        from espn_api.basketball import League
+
         return League(
             league_id=int(league_id),
             year=int(season_year),
@@ -182,16 +418,23 @@ class FantasyBot:
         team_id = self._get_setting("TEAM_ID", "league", "team_id")
         team_id = self._require_setting("TEAM_ID", team_id)
         
-        for team in self.league.teams:
-            if int(team.team_id) == int(team_id):
-                return team
-        raise ValueError(f"Could not find team_id={team_id} in league")
+        teams_by_id = {int(team.team_id): team for team in self.league.teams}
+        try:
+            return teams_by_id[int(team_id)]
+        except KeyError:
+            raise ValueError(f"Could not find team_id={team_id} in league") from None
 
     @staticmethod
     def points_value(player: Any) -> float:
-        avg_points = float(getattr(player, "avg_points", 0.0) or 0.0)
-        projected_avg_points = float(getattr(player, "projected_avg_points", 0.0) or 0.0)
-        return (avg_points * 0.7) + (projected_avg_points * 0.3)
+        # Memoized on the player: it is a sort key called many times per cycle,
+        # and player stats don't change for the lifetime of a League fetch.
+        cached = getattr(player, "_pv", None)
+        if cached is not None:
+            return cached
+        avg_points = _float_attr(player, "avg_points")
+        projected_avg_points = _float_attr(player, "projected_avg_points")
+        value = player._pv = (avg_points * 0.7) + (projected_avg_points * 0.3)
+        return value
 
     @staticmethod
     def _week_remaining_value(player: Any) -> float:
@@ -200,63 +443,67 @@ class FantasyBot:
 
     @staticmethod
     def _player_rank(player: Any) -> int | None:
-        for attr in ("rank", "projected_rank", "draft_rank"):
-            value = getattr(player, attr, None)
-            if isinstance(value, (int, float)):
-                return int(value)
-        return None
+        # espn_api players carry none of these today, so this is usually three
+        # dict misses and None (rank guardrail off). Kept for data sources that do.
+        d = player.__dict__
+        value = d.get("rank") or d.get("projected_rank") or d.get("draft_rank")
+        return int(value) if isinstance(value, (int, float)) else None
 
     @staticmethod
     def _season_ending(player: Any) -> bool:
-        status = str(getattr(player, "injuryStatus", "") or "").upper()
-        note = str(getattr(player, "injury_note", "") or "").upper()
-        flags = ("OUT FOR SEASON", "SEASON-ENDING", "IR")
-        return any(flag in status or flag in note for flag in flags)
+        note = getattr(player, "injury_note", "") or ""
+        return _SEASON_END_RE.search(f"{_status_of(player)}\n{note}") is not None
 
     def _is_droppable(self, player: Any) -> bool:
-        guardrails = self.context["strategy"]["protection_guardrails"]
-        untouchables = {p.lower() for p in guardrails.get("untouchables", [])}
-        if str(getattr(player, "name", "")).lower() in untouchables:
+        if _attr_str(player, "name").lower() in self._untouchables:
             return False
 
-        rank_limit = int(guardrails.get("drop_block_orank_better_than", 50))
-        allow_season_ending = bool(guardrails.get("allow_drop_if_season_ending_injury", True))
         rank = self._player_rank(player)
-        if rank is not None and rank < rank_limit:
-            return allow_season_ending and self._season_ending(player)
+        if rank is not None and rank < self._rank_limit:
+            return self._allow_season_ending and self._season_ending(player)
 
         return True
 
     def get_streaming_candidates(self) -> list[Any]:
-        roster = list(getattr(self.team, "roster", []))
-        droppable = [p for p in roster if self._is_droppable(p)]
-        return sorted(droppable, key=self._week_remaining_value)[:3]
+        # Score each droppable player once; the roster index breaks ties so
+        # players are never compared and equal values keep roster order.
+        scored = [
+            (self._week_remaining_value(p), i, p)
+            for i, p in enumerate(getattr(self.team, "roster", ()))
+            if self._is_droppable(p)
+        ]
+        return [p for _, _, p in heapq.nsmallest(3, scored)]
 
     def _weekly_transactions_used(self) -> int:
-        for attr in ("transaction_counter", "acquisitions", "moves"):
-            value = getattr(self.team, attr, None)
-            if isinstance(value, int):
-                return value
-            if isinstance(value, dict):
-                for key in ("week", "weekly", "acquisitions"):
-                    if isinstance(value.get(key), int):
-                        return value[key]
-        return int(self.context.get("tracking", {}).get("weekly_transactions_used", 0))
+        # espn_api's Team exposes transactionCounter.acquisitions as a plain int;
+        # it has no transaction_counter / moves attributes to probe.
+        value = getattr(self.team, "acquisitions", None)
+        if isinstance(value, int):
+            return value
+        return int(self.context["tracking"]["weekly_transactions_used"])
+
+    def _get_free_agents(self, size: int = 50) -> list[Any]:
+        """Return ESPN free agents, fetched at most once per size for this bot."""
+        if size not in self._fa_cache:
+            self._fa_cache[size] = self.league.free_agents(size=size)
+        return self._fa_cache[size]
 
     def _reset_counter_if_new_week(self) -> None:
         """Reset weekly transaction counter if we've crossed into a new scoring week."""
-        last_run_str = self.context.get("tracking", {}).get("last_run_utc", "")
+        last_run_str = self.context["tracking"]["last_run_utc"]
         if not last_run_str:
             return
         try:
             last_run = datetime.fromisoformat(last_run_str)
             today = datetime.now(timezone.utc)
             if last_run.isocalendar()[1] != today.isocalendar()[1] or last_run.year != today.year:
-                self.context.setdefault("tracking", {})["weekly_transactions_used"] = 0
+                self.context["tracking"]["weekly_transactions_used"] = 0
         except Exception:
             pass
 
+    @cached_property
     def _weekly_transaction_limit(self) -> int:
+        """Weekly add limit: context.json override, else the league setting, else 7."""
         strategy_limit = self.context["strategy"]["tiered_streaming"].get("weekly_transaction_limit")
         if isinstance(strategy_limit, int):
             return strategy_limit
@@ -270,32 +517,25 @@ class FantasyBot:
         Returns list of suggested actions. If dry_run=False and confirmed, executes moves.
         """
         actions: list[str] = []
-        roster = list(getattr(self.team, "roster", []))
-        
-        max_ir_slots = int(self.context.get("league", {}).get("max_ir_slots", 1))
+        max_ir_slots = int(self.context["league"]["max_ir_slots"])
 
-        # Find players who should be moved TO IR (OUT status but not in IR slot)
+        # One pass: OUT players not yet on IR, and healthy players occupying IR.
         out_players = []
-        for player in roster:
-            slot = str(getattr(player, "lineupSlot", "")).upper()
-            injury_status = str(getattr(player, "injuryStatus", "") or "").upper()
-            if injury_status == "OUT" and slot not in {"IR", "IL"}:
-                out_players.append(player)
-
-        # Find players who should be activated FROM IR (healthy but in IR slot)
         healthy_in_ir = []
         current_ir_count = 0
-        for player in roster:
-            slot = str(getattr(player, "lineupSlot", "")).upper()
-            injury_status = str(getattr(player, "injuryStatus", "") or "").upper()
-            if slot in {"IR", "IL"}:
+        for player in getattr(self.team, "roster", ()):
+            slot = _slot_of(player)
+            injury_status = _status_of(player)
+            if slot in _IR_SLOTS:
                 current_ir_count += 1
-                if injury_status in {"ACTIVE", "HEALTHY", ""}:
+                if injury_status in _HEALTHY:
                     healthy_in_ir.append(player)
+            elif injury_status == "OUT":
+                out_players.append(player)
 
         available_ir_slots = max(0, max_ir_slots - current_ir_count)
         # Sort by PPG descending so we prioritize the most valuable injured player
-        out_players.sort(key=lambda p: getattr(p, "avg_points", 0) or 0, reverse=True)
+        out_players.sort(key=lambda p: _float_attr(p, "avg_points"), reverse=True)
         out_players = out_players[:available_ir_slots]
 
         # Generate suggestions
@@ -317,59 +557,82 @@ class FantasyBot:
 
         Returns list of suggested swaps as human-readable strings.
         """
-        roster = list(getattr(self.team, "roster", []))
-        bench = [p for p in roster if str(getattr(p, "lineupSlot", "")).upper() in {"BE"}]
-        starters = [p for p in roster if str(getattr(p, "lineupSlot", "")).upper() not in {"BE", "IR"}]
+        bench: list[Any] = []
+        starters: list[Any] = []
+        for p in getattr(self.team, "roster", ()):
+            self.points_value(p)  # memoize _pv so sorts below can use _BY_POINTS
+            slot = _slot_of(p)
+            if slot in _BENCH_SLOTS:
+                bench.append(p)
+            elif slot not in _IR_SLOTS:
+                starters.append(p)
 
         todays_teams = _get_todays_nba_team_ids()
         actions: list[str] = []
         used_bench_ids: set[int] = set()
+        replaced_starter_ids: set[int] = set()
 
         # Pass 1: bench starters with no game today, promote bench players that DO play.
-        # Skip starters already flagged as AT_RISK (handled by urgent_swaps elsewhere).
-        AT_RISK = {"OUT", "DOUBTFUL", "DTD", "DAY_TO_DAY"}
+        # Skip starters already flagged as at-risk (handled by urgent_swaps elsewhere).
         healthy_bench = [
             p for p in bench
-            if str(getattr(p, "injuryStatus", "") or "").upper() not in AT_RISK
+            if _status_of(p) not in _AT_RISK
         ]
         bench_with_game = sorted(
             [p for p in healthy_bench if _has_game_today(p, todays_teams)],
-            key=self.points_value,
+            key=_BY_POINTS,
             reverse=True,
         )
         for starter in starters:
             if _has_game_today(starter, todays_teams):
                 continue
-            status = str(getattr(starter, "injuryStatus", "") or "").upper()
-            if status in AT_RISK:
+            status = _status_of(starter)
+            if status in _AT_RISK:
                 continue  # already surfaced as an urgent swap
             available = [p for p in bench_with_game if id(p) not in used_bench_ids]
             if not available:
                 break
-            replacement = available[0]
+            slot = _slot_of(starter)
+            replacement = next((p for p in available if _can_fill_slot(p, slot)), None)
+            if replacement is None:
+                continue  # nobody on the bench can legally play this slot
             used_bench_ids.add(id(replacement))
+            replaced_starter_ids.add(id(starter))
             actions.append(
                 f"Start {replacement.name} (plays today, {self.points_value(replacement):.2f} PPG) "
                 f"over {starter.name} (no game today, {self.points_value(starter):.2f} PPG)"
             )
 
         # Pass 2: PPG optimisation on the remaining bench/starter slots.
+        # Each bench player (best first) replaces the weakest remaining starter
+        # whose slot they are eligible for and whom they outscore. Works on
+        # (value, player) pairs scored once; sorting on item 0 only means players
+        # themselves are never compared, and tie order stays stable.
+        by_value = operator.itemgetter(0)
         remaining_bench = sorted(
-            [p for p in healthy_bench if id(p) not in used_bench_ids],
-            key=self.points_value,
+            [(self.points_value(p), p) for p in healthy_bench if id(p) not in used_bench_ids],
+            key=by_value,
             reverse=True,
         )
-        remaining_starters = sorted(starters, key=self.points_value)
+        remaining_starters = sorted(
+            [(self.points_value(p), p) for p in starters if id(p) not in replaced_starter_ids],
+            key=by_value,
+        )
 
-        for bench_player, starter_player in zip(remaining_bench, remaining_starters):
-            if self.points_value(bench_player) > self.points_value(starter_player):
-                bench_val = self.points_value(bench_player)
-                starter_val = self.points_value(starter_player)
+        for bench_val, bench_player in remaining_bench:
+            for i, (starter_val, starter_player) in enumerate(remaining_starters):
+                if starter_val >= bench_val:
+                    break  # starters are ascending; the rest all outscore this player
+                slot = _slot_of(starter_player)
+                if not _can_fill_slot(bench_player, slot):
+                    continue
+                del remaining_starters[i]
                 gain = bench_val - starter_val
                 actions.append(
                     f"Start {bench_player.name} ({bench_val:.2f} PPG) over "
                     f"{starter_player.name} ({starter_val:.2f} PPG) [+{gain:.2f}]"
                 )
+                break
 
         return actions
 
@@ -400,45 +663,39 @@ class FantasyBot:
         "urgent_swaps" covers OUT/DOUBTFUL/DTD starters where a healthy bench
         player is available. "questionable" lists starters to monitor (no swap).
         """
-        # ESPN API returns DAY_TO_DAY (not DTD) and DOUBTFUL for at-risk players
-        AT_RISK = {"OUT", "DOUBTFUL", "DTD", "DAY_TO_DAY"}
-        QUESTIONABLE = {"QUESTIONABLE"}
-        STARTING_SLOTS = {"PG", "SG", "SF", "PF", "C", "G", "F", "UT", "UTIL"}
-        BENCH_SLOTS = {"BE"}
-        UNAVAILABLE = AT_RISK | QUESTIONABLE | {"IR", "IL"}
-
         roster = list(getattr(self.team, "roster", []))
 
         starters = [
             p for p in roster
-            if str(getattr(p, "lineupSlot", "")).upper() in STARTING_SLOTS
+            if _slot_of(p) in _STARTING_SLOTS
         ]
         bench = [
             p for p in roster
-            if str(getattr(p, "lineupSlot", "")).upper() in BENCH_SLOTS
+            if _slot_of(p) in _BENCH_SLOTS
         ]
 
         healthy_bench = [
             p for p in bench
-            if str(getattr(p, "injuryStatus", "") or "").upper() not in UNAVAILABLE
+            if _status_of(p) not in _UNAVAILABLE
         ]
         todays_teams = _get_todays_nba_team_ids()
-        healthy_bench_sorted = sorted(
-            [p for p in healthy_bench if _has_game_today(p, todays_teams, fallback=False)],
-            key=self.points_value,
-            reverse=True,
+        # Every swap below promotes the same player: the highest-PPG healthy bench
+        # player who plays today. Find them once instead of sorting per starter.
+        best_bench, _ = _best(
+            (p for p in healthy_bench if _has_game_today(p, todays_teams, fallback=False)),
+            self.points_value,
         )
 
         urgent_swaps: list[dict] = []
         questionable: list[dict] = []
 
         for starter in starters:
-            status = str(getattr(starter, "injuryStatus", "") or "").upper()
+            status = _status_of(starter)
             ppg = self.points_value(starter)
-            slot = str(getattr(starter, "lineupSlot", "")).upper()
+            slot = _slot_of(starter)
 
-            if status in AT_RISK:
-                replacement = healthy_bench_sorted[0] if healthy_bench_sorted else None
+            if status in _AT_RISK:
+                replacement = best_bench
                 if replacement is not None:
                     starter_id = int(
                         getattr(starter, "playerId", getattr(starter, "player_id", 0)) or 0
@@ -456,7 +713,7 @@ class FantasyBot:
                         "replacement_player_id": replacement_id,
                         "starter_slot": slot,
                     })
-            elif status in QUESTIONABLE:
+            elif status in _QUESTIONABLE:
                 questionable.append({
                     "name": getattr(starter, "name", "Unknown"),
                     "status": status,
@@ -467,23 +724,16 @@ class FantasyBot:
         no_game_swaps: list[dict] = []
 
         for starter in starters:
-            status = str(getattr(starter, "injuryStatus", "") or "").upper()
-            if status in AT_RISK:
+            status = _status_of(starter)
+            if status in _AT_RISK:
                 continue  # already in urgent_swaps
             if _has_game_today(starter, todays_teams):
                 continue  # plays today, nothing to do
 
-            # Find the highest-PPG healthy bench player who DOES play today.
-            bench_with_game = sorted(
-                [p for p in healthy_bench if _has_game_today(p, todays_teams, fallback=False)],
-                key=self.points_value,
-                reverse=True,
-            )
-            if not bench_with_game:
+            replacement = best_bench
+            if replacement is None:
                 continue
-
-            replacement = bench_with_game[0]
-            slot = str(getattr(starter, "lineupSlot", "")).upper()
+            slot = _slot_of(starter)
             starter_id = int(
                 getattr(starter, "playerId", getattr(starter, "player_id", 0)) or 0
             )
@@ -525,8 +775,6 @@ class FantasyBot:
             ESPN_LINEUP_BODY or ESPN_LINEUP_BODY_FILE in your .env.
         """
         try:
-            from espn_lineup import lineup_swap, get_slot_id
-
             swid = self._get_setting("SWID", "league", "espn_auth", "swid") or ""
             espn_s2 = self._get_setting("ESPN_S2", "league", "espn_auth", "espn_s2") or ""
             swid = self._require_setting("SWID", swid)
@@ -555,50 +803,65 @@ class FantasyBot:
         except Exception as e:
             return f"Lineup swap failed: {e}"
 
-    def execute_streaming(self, dry_run: bool = True) -> list[str]:
+    def _stream_side(self, player: Any, games: int, week_val: float) -> str:
+        """Format one side of a stream for action strings (the web UI parses this)."""
+        return f"{player.name} ({self.points_value(player):.1f} PPG × {games}g = {week_val:.1f} wk pts)"
+
+    def _plan_stream(self) -> tuple[str, CandidateSwap | None]:
+        """Decide today's stream without side effects on ESPN.
+
+        Returns (message, swap): swap is None when streaming is skipped, and
+        message explains why; otherwise message is the "WOULD DROP ..." line.
+        """
         self._reset_counter_if_new_week()
-        actions: list[str] = []
         tier_3 = self.get_streaming_candidates()
         if not tier_3:
-            return ["No eligible Tier 3 players available for streaming."]
+            return "No eligible Tier 3 players available for streaming.", None
+
+        # Cheap local checks first so a capped week never pays for the ESPN fetch.
+        weekly_used = self._weekly_transactions_used()
+        weekly_limit = self._weekly_transaction_limit
+        self.context["tracking"]["weekly_transactions_used"] = weekly_used
+
+        if weekly_used >= weekly_limit:
+            return f"Streaming skipped: weekly transaction limit reached ({weekly_used}/{weekly_limit}).", None
 
-        free_agents = self.league.free_agents(size=50)
+        free_agents = self._get_free_agents(size=50)
         if not free_agents:
-            return ["No free agents returned by ESPN API."]
+            return "No free agents returned by ESPN API.", None
 
         worst_player = tier_3[0]  # already sorted by _week_remaining_value ascending
-        best_fa = max(free_agents, key=self._week_remaining_value)
-
         worst_games = _games_remaining_this_week(worst_player)
-        best_games = _games_remaining_this_week(best_fa)
-        worst_week_val = self._week_remaining_value(worst_player)
-        best_week_val = self._week_remaining_value(best_fa)
-        min_points_gain = float(self.context["strategy"]["tiered_streaming"].get("min_points_gain", 3.0))
+        worst_week_val = self.points_value(worst_player) * worst_games
 
-        weekly_used = self._weekly_transactions_used()
-        weekly_limit = self._weekly_transaction_limit()
-        self.context.setdefault("tracking", {})["weekly_transactions_used"] = weekly_used
-
-        if weekly_used >= weekly_limit:
-            return [f"Streaming skipped: weekly transaction limit reached ({weekly_used}/{weekly_limit})."]
+        # ESPN orders free agents by ownership, not projection, so every one has
+        # to be scored — but only once.
+        best_fa, best_week_val = _best(free_agents, self._week_remaining_value)
+        best_games = _games_remaining_this_week(best_fa)
+        min_points_gain = self._min_points_gain
 
+        drop_text = self._stream_side(worst_player, worst_games, worst_week_val)
+        add_text = self._stream_side(best_fa, best_games, best_week_val)
         if best_week_val <= worst_week_val + min_points_gain:
-            return [
-                f"Streaming skipped: best FA {best_fa.name} "
-                f"({self.points_value(best_fa):.1f} PPG × {best_games}g = {best_week_val:.1f} wk pts) "
-                f"does not beat {worst_player.name} "
-                f"({self.points_value(worst_player):.1f} PPG × {worst_games}g = {worst_week_val:.1f} wk pts) "
+            return (
+                f"Streaming skipped: best FA {add_text} does not beat {drop_text} "
                 f"by min gain {min_points_gain:.1f}."
-            ]
-
-        if dry_run:
-            return [
-                f"WOULD DROP {worst_player.name} "
-                f"({self.points_value(worst_player):.1f} PPG × {worst_games}g = {worst_week_val:.1f} wk pts) "
-                f"FOR {best_fa.name} "
-                f"({self.points_value(best_fa):.1f} PPG × {best_games}g = {best_week_val:.1f} wk pts)"
-            ]
+            ), None
+
+        swap = CandidateSwap(
+            drop_player=worst_player,
+            add_player=best_fa,
+            gain=best_week_val - worst_week_val,
+            drop_games=worst_games,
+            add_games=best_games,
+            drop_week_value=worst_week_val,
+            add_week_value=best_week_val,
+        )
+        return f"WOULD DROP {drop_text} FOR {add_text}", swap
 
+    def _commit_stream(self, swap: CandidateSwap) -> list[str]:
+        """Submit a planned add/drop to ESPN and count it against the weekly limit."""
+        worst_player, best_fa = swap.drop_player, swap.add_player
         drop_id = int(getattr(worst_player, "playerId", getattr(worst_player, "player_id", 0)) or 0)
         add_id = int(getattr(best_fa, "playerId", getattr(best_fa, "player_id", 0)) or 0)
 
@@ -606,8 +869,6 @@ class FantasyBot:
             return ["Streaming blocked: unable to resolve ESPN player IDs for add/drop execution."]
 
         try:
-            from espn_transactions import add_drop
-
             swid = self._get_setting("SWID", "league", "espn_auth", "swid") or ""
             espn_s2 = self._get_setting("ESPN_S2", "league", "espn_auth", "espn_s2") or ""
             swid = self._require_setting("SWID", swid)
@@ -626,40 +887,92 @@ class FantasyBot:
         except Exception as e:
             return [f"Streaming execute failed: {e}"]
 
-        self.context["tracking"]["weekly_transactions_used"] = weekly_used + 1
-        actions.append(
-            f"Executed stream: dropped {worst_player.name} "
-            f"({self.points_value(worst_player):.1f} PPG × {worst_games}g = {worst_week_val:.1f} wk pts) "
-            f"for {best_fa.name} "
-            f"({self.points_value(best_fa):.1f} PPG × {best_games}g = {best_week_val:.1f} wk pts)."
-        )
-        return actions
+        self._fa_cache.clear()  # the added player is no longer a free agent
+        # _plan_stream stored the current count just before this swap was planned.
+        self.context["tracking"]["weekly_transactions_used"] += 1
+        return [
+            f"Executed stream: dropped "
+            f"{self._stream_side(worst_player, swap.drop_games, swap.drop_week_value)} "
+            f"for {self._stream_side(best_fa, swap.add_games, swap.add_week_value)}."
+        ]
 
     def _update_context_md(self, actions: list[str]) -> None:
-        now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
-        untouchables = ", ".join(self.context["strategy"]["protection_guardrails"].get("untouchables", []))
-        game_plan = (
-            "Attack tomorrow with lineup re-optimization before tip-off, then stream one Tier-3 spot "
-            "only if best FA avg_points clears min_points_gain and weekly adds remain."
-        )
+        now_dt = datetime.now(timezone.utc)  # one timestamp for both the log and tracking
+        now = now_dt.strftime("%Y-%m-%d %H:%M UTC")
+        untouchables = ", ".join(self.context["strategy"]["protection_guardrails"]["untouchables"])
+        game_plan = _GAME_PLAN
 
-        self.context["tracking"]["last_run_utc"] = datetime.now(timezone.utc).isoformat()
+        self.context["tracking"]["last_run_utc"] = now_dt.isoformat()
         self.context["tracking"]["moves_made_today"] = actions
         self.context["tracking"]["plan_for_tomorrow"] = game_plan
 
-        content = self.context_md_path.read_text(encoding="utf-8")
-        run_block = (
-            "\n\n## Latest Automated Run\n"
-            f"- **Timestamp:** {now}\n"
-            f"- **Current Record:** {self.context['season']['current_record']}\n"
-            f"- **Moves Made Today:** {'; '.join(actions)}\n"
-            f"- **Current Untouchables:** {untouchables}\n"
-            f"- **Game Plan (Next 24h):** {game_plan}\n"
-        )
+        moves = "; ".join(actions)
+        run_block = "".join((
+            "\n\n## Latest Automated Run\n",
+            "- **Timestamp:** ", now, "\n",
+            "- **Current Record:** ", str(self.context["season"]["current_record"]), "\n",
+            "- **Moves Made Today:** ", moves, "\n",
+            "- **Current Untouchables:** ", untouchables, "\n",
+            "- **Game Plan (Next 24h):** ", game_plan, "\n\n",
+        ))
+
+        # Truncate any previous run block in place and append the new one, rather
+        # than reading and rewriting the whole document through Python strings.
+        with self.context_md_path.open("r+b") as fp:
+            st = os.fstat(fp.fileno())
+            cached = _context_md_cut_cache.get(self.context_md_path)
+            if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+                cut = cached[2]
+            else:
+                cut = -1
+                if st.st_size:
+                    with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        cut = mm.find(b"## Latest Automated Run")
+                        while cut > 0 and mm[cut - 1] in b" \t\r\n\x0b\x0c":
+                            cut -= 1  # drop trailing whitespace before the old block
+            if cut >= 0:
+                fp.truncate(cut)
+            fp.seek(0, os.SEEK_END)
+            fp.write(run_block.encode("utf-8"))
+            fp.flush()
+            if cut >= 0:
+                # Our block now starts at cut; remember it against the new stat.
+                st = os.fstat(fp.fileno())
+                _context_md_cut_cache[self.context_md_path] = (st.st_mtime_ns, st.st_size, cut)
+
+    def _refresh_league(self) -> None:
+        """Re-fetch rosters/injuries in place so the next plan sees current data.
+
+        League.fetch_league() would also re-download every pro player and append
+        the draft to league.draft again; planning reads neither, so only the
+        league view (settings, scoring period, rosters) and teams are rebuilt.
+        """
+        from espn_api.base_league import BaseLeague
+
+        league = self.league
+        data = BaseLeague._fetch_league(league)
+        league._map_matchup_ids(data["schedule"])
+        league._fetch_teams(data)
+        self.__dict__.pop("team", None)  # _fetch_teams rebuilds Team/Player objects
+        self._fa_cache.clear()
 
-        if "## Latest Automated Run" in content:
-            content = content.split("## Latest Automated Run", 1)[0].rstrip()
-        self.context_md_path.write_text(content + run_block + "\n", encoding="utf-8")
+    def _plan_all(self) -> tuple[list[str], list[str], str, CandidateSwap | None]:
+        """Plan IR, lineup and streaming concurrently (no ESPN writes).
+
+        Each planner waits on its own network call (scoreboard, free agents), so
+        running them side by side hides that latency. They only read the roster;
+        the one context write (weekly counter) happens inside _plan_stream alone.
+
+        Returns (ir_actions, lineup_actions, streaming_message, stream_swap).
+        """
+        # Three threads touching the lazy league/team first would each fetch it.
+        self.prime()
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            stream_future = pool.submit(self._plan_stream)
+            ir_future = pool.submit(self.manage_ir, True)
+            lineup_future = pool.submit(self.optimize_lineup, True)
+            streaming_message, stream_swap = stream_future.result()
+            return ir_future.result(), lineup_future.result(), streaming_message, stream_swap
 
     def get_suggestions(self) -> dict[str, list[str]]:
         """Return structured suggestions for API use (no side effects).
@@ -667,13 +980,11 @@ class FantasyBot:
         Returns:
             Dict with keys "ir", "lineup", "streaming", each a list of action strings.
         """
-        ir_actions = self.manage_ir(dry_run=True)
-        lineup_actions = self.optimize_lineup(dry_run=True)
-        streaming_actions = self.execute_streaming(dry_run=True)
+        ir_actions, lineup_actions, streaming_message, _ = self._plan_all()
         return {
             "ir": ir_actions,
             "lineup": lineup_actions,
-            "streaming": streaming_actions,
+            "streaming": [streaming_message],
         }
 
     def confirm_and_execute(self, ir_actions: list[str], lineup_actions: list[str], streaming_actions: list[str]) -> tuple[bool, bool]:
@@ -725,6 +1036,9 @@ class FantasyBot:
         
         # Get confirmation
         while True:
+            # Full line + Enter on purpose: "yes" sends a real add/drop to ESPN, so a
+            # stray single keypress must not be enough. Only the harmless
+            # decline/new follow-up below reads one key.
             response = input("\nExecute these changes? (yes/no): ").strip().lower()
             if response in ("yes", "y"):
                 return (True, False)  # Execute
@@ -732,7 +1046,7 @@ class FantasyBot:
                 # User declined - offer options
                 print("\n" + "=" * 60)
                 while True:
-                    choice = input("Decline fully (no changes today) or generate new suggestions? (decline/new): ").strip().lower()
+                    choice = _read_choice("Decline fully (no changes today) or generate new suggestions? (d/n): ")
                     if choice in ("decline", "d", "exit", "quit"):
                         print("\n❌ Changes declined. No moves executed today.")
                         return (False, False)  # Exit
@@ -740,7 +1054,7 @@ class FantasyBot:
                         print("\n🔄 Generating new suggestions...")
                         return (False, True)  # Generate new
                     else:
-                        print("Please enter 'decline' or 'new'")
+                        print("Please enter 'd' (decline) or 'n' (new)")
             else:
                 print("Please enter 'yes' or 'no'")
 
@@ -758,14 +1072,21 @@ class FantasyBot:
         """
         max_iterations = 10  # Prevent infinite loops
         iteration = 0
+        # A bot can outlive one cycle (the API caches it), so start from a fresh
+        # free-agent list; repeat iterations below then share it.
+        self._fa_cache.clear()
+        previous_plan = None
         
         while iteration < max_iterations:
             iteration += 1
             
-            # Always collect suggestions first (internal dry_run=True)
-            ir_actions = self.manage_ir(dry_run=True)
-            lineup_actions = self.optimize_lineup(dry_run=True)
-            streaming_actions = self.execute_streaming(dry_run=True)
+            # Always collect suggestions first (no ESPN writes).
+            ir_actions, lineup_actions, streaming_message, stream_swap = self._plan_all()
+            streaming_actions = [streaming_message]
+            plan = (ir_actions, lineup_actions, streaming_actions)
+            if plan == previous_plan:
+                print("\nℹ️  ESPN data unchanged since the last suggestions — same moves proposed.")
+            previous_plan = plan
             
             # If dry_run mode, just return suggestions
             if dry_run:
@@ -779,11 +1100,13 @@ class FantasyBot:
             # API mode: no interactive prompt
             if api_confirm is not None:
                 if api_confirm:
-                    # Execute and return
+                    # Execute and return. ESPN writes stay sequential on purpose: a cycle
+                    # issues at most one add/drop, and concurrent roster transactions
+                    # against the same team can be rejected or applied out of order.
                     executed_actions = []
-                    if streaming_actions and any("WOULD DROP" in a for a in streaming_actions):
-                        executed_actions.extend(self.execute_streaming(dry_run=False))
-                    elif streaming_actions:
+                    if stream_swap is not None:
+                        executed_actions.extend(self._commit_stream(stream_swap))
+                    else:
                         executed_actions.extend(streaming_actions)
                     for action in ir_actions:
                         executed_actions.append(f"⚠️  {action} (IR execution not yet implemented)")
@@ -804,12 +1127,12 @@ class FantasyBot:
                 print("\n✅ Executing changes...")
                 executed_actions = []
                 
-                # Execute streaming (only one that currently has execution logic)
-                if streaming_actions and any("WOULD DROP" in a for a in streaming_actions):
-                    streaming_executed = self.execute_streaming(dry_run=False)
-                    executed_actions.extend(streaming_executed)
-                elif streaming_actions:
-                    # Streaming actions that aren't "WOULD DROP" (like skip messages)
+                # Execute streaming (only one that currently has execution logic).
+                # Commit the swap that was just shown rather than re-planning it.
+                if stream_swap is not None:
+                    executed_actions.extend(self._commit_stream(stream_swap))
+                else:
+                    # Skip messages (limit reached, no gain, ...) are reported as-is
                     executed_actions.extend(streaming_actions)
                 
                 # IR and lineup execution would go here when API methods are available
@@ -827,8 +1150,9 @@ class FantasyBot:
                 # User declined fully - exit
                 return []
             
-            # generate_new=True - loop back to generate new suggestions
-            # (continue while loop)
+            # generate_new=True - refresh from ESPN, then loop back to generate
+            # new suggestions (planning the same data again would repeat them)
+            self._refresh_league()
         
         # Max iterations reached
         print("\n⚠️  Maximum iterations reached. Exiting.")
@@ -846,6 +1170,11 @@ def main() -> None:
     )
     args = parser.parse_args()
 
+    # Write-module request logs (e.g. espn_lineup) go to stderr; LOG_LEVEL=DEBUG adds bodies.
+    logging.basicConfig(level=log_level_from_env(), format="%(message)s")
+
+    # The only bot for this process. Construction just reads context.json; the
+    # ESPN league is fetched once, on the first bot.league / bot.team access.
     bot = FantasyBot(context_path=DEFAULT_CONTEXT_PATH)
 
     # --- Lineup-check mode (used by game_day_check.yml GitHub Action) ---
@@ -919,7 +1248,7 @@ def main() -> None:
         api_confirm = True
     else:
         try:
-            dry_run = bool(bot.context.get("strategy", {}).get("tiered_streaming", {}).get("dry_run", True))
+            dry_run = bool(bot.context["strategy"]["tiered_streaming"]["dry_run"])
         except Exception:
             dry_run = True
         api_confirm = None  # interactive: show confirmation prompt